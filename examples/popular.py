@@ -37,14 +37,20 @@ popularity = pd.read_json(
     "https://raw.githubusercontent.com/adactio/TheSession-data/main/json/tune_popularity.json"
 )
 
+# Pick the oldest setting of each tune (like `match`)
+tunes = tunes.loc[tunes.groupby("tune_id")["setting_id"].idxmin()]
+
 # Note:
 # - only tunes with >=10 are included in the popularity data
 # - currently tune 12130 is in the popularity data but not in the tunes data
 #   (a weird tune page with no settings)
+tunebooks = popularity.set_index("tune_id")["tunebooks"]
+assert tunebooks.index.is_unique, "expected one popularity entry per tune"
 tunes = (
-    tunes.merge(popularity[["tune_id", "tunebooks"]], how="inner", on="tune_id")
+    tunes.assign(tunebooks=tunes["tune_id"].map(tunebooks))
+    .dropna(subset=["tunebooks"])
+    .astype({"tunebooks": int})
     .sort_values(["type", "tunebooks"], ascending=[True, False])
-    .drop_duplicates(["tune_id"], keep="first")
     .reset_index(drop=True)
 )
 
@@ -66,37 +72,48 @@ according to
 <a href="https://github.com/adactio/TheSession-data/blob/main/json/tune_popularity.json">the data dump</a>,
 as of {now}.
 """
-body = ""
+body = []
 for type_, n in to_take.items():
-    body += f'<h2 id="{type_}s">{type_.capitalize()}s</h2>\n'
-    df = tunes.query(f"type == '{type_}'").head(n)
-    for i, row in enumerate(df.itertuples(index=False), start=1):
+    body.append(f'<h2 id="{type_}s">{type_.capitalize()}s</h2>\n')
+    rows = (
+        tunes[["name", "tune_id", "setting_id", "type", "key", "abc", "tunebooks"]]
+        .loc[tunes["type"] == type_]
+        .head(n)
+        .to_dict("records")
+    )
+    for i, row in enumerate(rows, start=1):
+        key = row["key"][:4]
         d: Result = {
-            "name": row.name,
-            "tune_id": row.tune_id,
-            "setting_id": row.setting_id,
-            "type": row.type,
-            "key": row.key[:4],  # type: ignore[index]
-            "starts": starts(row.abc.replace("\r\n", "")),  # type: ignore[arg-type]
-            "name_input": row.name,
+            "name": row["name"],
+            "tune_id": row["tune_id"],
+            "setting_id": row["setting_id"],
+            "type": row["type"],
+            "key": key,
+            "starts": starts(row["abc"]),
+            "name_input": row["name"],
         }
         if (i - 1) % 20 == 0:
             a, b = i, min(i + 19, n)
-            body += f'<h3 id="{type_}s-{a}-{b}">{a}&ndash;{b}</h3>\n'
-        body += f'<h4 id="{type_}-{i}">{row.name} ({row.key[:4]} {row.type})</h4>'  # type: ignore[index, str-bytes-safe]
-        body += f"{i}.&ensp;({row.tunebooks})&ensp;"
-        body += tune_to_html(d) + "\n"
+            body.append(f'<h3 id="{type_}s-{a}-{b}">{a}&ndash;{b}</h3>\n')
+        body += [
+            f'<h4 id="{type_}-{i}">{row["name"]} ({key} {row["type"]})</h4>',
+            f"{i}.&ensp;({row['tunebooks']})&ensp;",
+            tune_to_html(d),
+            "\n",
+        ]
 
-html = (
-    HEAD_SNIPPET
-    + "<body>\n"
-    + intro
-    + '\n<div class="js-toc-content">\n'
-    + body
-    + "</div>\n"
-    + RENDER_SNIPPET
-    + TOC_SNIPPET
-    + "</body>\n</html>"
+html = "".join(
+    [
+        HEAD_SNIPPET,
+        "<body>\n",
+        intro,
+        '\n<div class="js-toc-content">\n',
+        *body,
+        "</div>\n",
+        RENDER_SNIPPET,
+        TOC_SNIPPET,
+        "</body>\n</html>",
+    ]
 )
 
 with open("popular.html", "w", encoding="utf-8") as f:
@@ -8,65 +8,164 @@ for each tune in each set.
 from __future__ import annotations
 
 import logging
-import re
-from functools import lru_cache
+import os
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import chain
 from pathlib import Path
-from string import ascii_lowercase
-from typing import TypedDict, TYPE_CHECKING, NotRequired
+from typing import Any, TypedDict, TYPE_CHECKING, NotRequired
+
+from pyabc2.key import _MODE_ABBR_TO_FULL
 
 __version__ = "0.0.2.dev2"
 
 if TYPE_CHECKING:
     import pandas as pd
+    import requests
 
 HERE = Path(__file__).parent
 
 logger = logging.getLogger(__name__)
 
+
 USE_CWD_FILES = False
 """Use downloaded tunes/aliases JSON files in the CWD.
 Set before calling :func:`match` (or :func:`load_tunes` / :func:`load_aliases`).
 """
 
 
+def _cache_home() -> Path:
+    # Per the XDG spec, ignore XDG_CACHE_HOME if empty or relative
+    p = os.environ.get("XDG_CACHE_HOME")
+    if p and Path(p).is_absolute():
+        return Path(p)
+    return Path.home() / ".cache"
+
+
+CACHE_DIR = _cache_home() / __name__
+"""Where data downloaded from The Session is cached on disk between sessions."""
+
+CACHE_MAX_AGE = 24 * 60 * 60
+"""Re-download The Session data if the cached copy is older than this (seconds)."""
+
+FUZZY_SCORE_CUTOFF = 90
+"""Min score (0--100) for a fuzzy name match in :func:`match`."""
+
+MAX_WORKERS = 8
+"""Max number of concurrent requests to The Session API."""
+
+
+def _load_meta(which: str, columns: list[str]) -> pd.DataFrame:
+    """Load The Session data with :func:`pyabc2.sources.the_session.load_meta`,
+    keeping only `columns`,
+    going through the on-disk cache in :data:`CACHE_DIR`.
+    """
+    import pandas as pd
+
+    fp = CACHE_DIR / f"{which}.pkl"
+    if fp.is_file() and time.time() - fp.stat().st_mtime < CACHE_MAX_AGE:
+        try:
+            df = pd.read_pickle(fp)
+        except Exception as e:  # noqa: BLE001 (unpickling can raise almost anything)
+            # e.g. truncated file or one written by an incompatible pandas version
+            logger.warning(f"ignoring unreadable cached {which!r} data ({fp}): {e}")
+        else:
+            if set(columns) <= set(df.columns):
+                logger.debug(f"loaded cached {which!r} data from {fp}")
+                return df[columns]
+
+    from pyabc2.sources import the_session
+
+    df = the_session.load_meta(which)[columns]
+
+    # The cache is only an optimization, so failing to write it is not an error.
+    # Write to a temp file first so that other processes never see a partial file.
+    tmp = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=CACHE_DIR, prefix=f".{which}-", suffix=".pkl", delete=False
+        ) as f:
+            tmp = Path(f.name)
+            df.to_pickle(f)
+        os.replace(tmp, fp)
+    except OSError as e:
+        logger.warning(f"could not cache {which!r} data to {fp}: {e}")
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+
+    return df
+
+
 @lru_cache(1)
 def load_tunes() -> pd.DataFrame:
+    columns = ["tune_id", "setting_id", "type", "mode", "abc", "name"]
     if USE_CWD_FILES:
         import pandas as pd
 
-        df = pd.read_json("tunes.json")
+        df = pd.read_json("tunes.json")[columns]
     else:
-        from pyabc2.sources import the_session
-
-        # TODO: cache the files to disk, maybe as json.gz, instead of downloading every session
-        df = the_session.load_meta("tunes")
+        df = _load_meta("tunes", columns)
 
-    return df[["tune_id", "setting_id", "type", "mode", "abc", "name"]].rename(
-        columns={"mode": "key"}
+    df = df.rename(columns={"mode": "key"}).astype(
+        {"type": "category", "key": "category"}
     )
     # TODO: rename in pyabc2?
 
+    # Remove line breaks from the ABC once here instead of for each use
+    df["abc"] = df["abc"].str.replace("\r\n", "", regex=False)
+
+    return df
+
 
 @lru_cache(1)
-def load_aliases() -> pd.DataFrame:
-    import pandas as pd
+def load_aliases() -> dict[str, tuple[int, ...]]:
+    """Mapping of name/alias to the (sorted) IDs of the tunes it may refer to.
 
+    Names/aliases are normalized with :func:`normalize_name`.
+    """
     if USE_CWD_FILES:
+        import pandas as pd
+
         df = pd.read_json("aliases.json")
     else:
-        from pyabc2.sources import the_session
-
-        df = the_session.load_meta("aliases")
+        df = _load_meta("aliases", ["tune_id", "alias"])
 
     # TODO: should the primary name get preferential treatment?
     # Note we have to explicitly add primary name as an alias
-    return pd.concat(
-        [
-            load_tunes()[["tune_id", "name"]].rename(columns={"name": "alias"}),
-            df[["tune_id", "alias"]],
-        ],
-        ignore_index=True,
-    ).drop_duplicates()
+    # The tune data has a row per setting, so names repeat;
+    # dedup before normalizing (preserving data order, so the result is deterministic)
+    tunes = load_tunes()
+    pairs = dict.fromkeys(
+        chain(
+            zip(tunes["tune_id"].tolist(), tunes["name"].tolist()),
+            zip(df["tune_id"].tolist(), df["alias"].tolist()),
+        )
+    )
+    index: defaultdict[str, set[int]] = defaultdict(set)
+    for tune_id, alias in pairs:
+        index[normalize_name(alias)].add(tune_id)
+
+    return {alias: tuple(sorted(ids)) for alias, ids in index.items()}
+
+
+@lru_cache(1)
+def _tunes_by_id() -> dict[int, list[dict[str, Any]]]:
+    """Mapping of tune ID to its settings (:func:`load_tunes` records, except ABC)."""
+    index: defaultdict[int, list[dict[str, Any]]] = defaultdict(list)
+    for row in load_tunes().drop(columns="abc").to_dict("records"):
+        index[row["tune_id"]].append(row)  # type: ignore[arg-type]
+    return dict(index)
+
+
+@lru_cache(1)
+def _abc_by_setting_id() -> dict[int, str]:
+    """Mapping of setting ID to ABC (only needed for the selected setting)."""
+    tunes = load_tunes()
+    return dict(zip(tunes["setting_id"].tolist(), tunes["abc"].tolist()))
 
 
 def normalize_key(key: str) -> str:
@@ -75,10 +174,6 @@ def normalize_key(key: str) -> str:
     - Mode full name, in lowercase
     - No space between tonic and mode
     """
-
-    # TODO: not very general, should add full name option to Key class
-    from pyabc2.key import _MODE_ABBR_TO_FULL
-
     if len(key) == 1:
         key = key + "maj"
     elif key.endswith("m"):
@@ -87,6 +182,7 @@ def normalize_key(key: str) -> str:
     if len(key) > 4:
         return key
 
+    # TODO: not very general, should add full name option to Key class
     return key[0].upper() + _MODE_ABBR_TO_FULL[key[1:].lower()]
 
 
@@ -111,8 +207,7 @@ def normalize_name(name: str) -> str:
     """
     name = name.replace("’", "'")
     name = " ".join(
-        word.capitalize() if word[0] in ascii_lowercase else word
-        for word in name.split()
+        [word.capitalize() if word[0].islower() else word for word in name.split()]
     )
     if name.startswith("The "):
         name = name[4:] + ", The"
@@ -120,36 +215,56 @@ def normalize_name(name: str) -> str:
 
 
 def take_measures(abc: str, *, n: int = 5) -> str:
-    i = c = 0
-    while c < n:
-        if i >= len(abc):
-            break
-        if abc[i] == "|":
-            c += 1
-        i += 1
-    return abc[:i]
+    """Take `abc` up to and including the `n`-th bar line (or all of it)."""
+    i = -1
+    for _ in range(n):
+        i = abc.find("|", i + 1)
+        if i < 0:
+            return abc
+    return abc[: i + 1]
 
 
-def starts(abc, *, n: int = 5) -> list[str]:
-    # Take first few bars
-    start = take_measures(abc, n=n)
+def _scan_abc(abc: str) -> tuple[list[int], list[int]]:
+    """Find the bar lines and the likely start of each part after the first
+    in a single pass over `abc`.
 
-    # Try to find the start of next parts, looking for |: or ||
+    Returns the positions of all ``|`` characters
+    and the indices (into the former) of the part start candidates.
+    """
+    # The start of next parts is marked by |: or ||
     # Reject || at end and |: that follows ||
     offset = 10
-    i_part_cands = []
-    for m in re.finditer(r"\|[:|]", abc[offset:]):
-        i = m.start() + offset
-        if "|" in abc[i - 3 : i]:
-            continue
-        if len(abc) - i < 10:
-            continue
-        i_part_cands.append(i)
-    logger.debug(f"part start candidates: {i_part_cands}")
+    n_abc = len(abc)
+    bars: list[int] = []
+    part_cands: list[int] = []
+    i = abc.find("|")
+    while i >= 0:
+        if (
+            i >= offset
+            and abc[i + 1 : i + 2] in {":", "|"}
+            and (not bars or i - bars[-1] > 3)
+            and n_abc - i >= 10
+        ):
+            part_cands.append(len(bars))
+        bars.append(i)
+        i = abc.find("|", i + 1)
+
+    return bars, part_cands
+
+
+def starts(abc: str, *, n: int = 5) -> list[str]:
+    bars, part_cands = _scan_abc(abc)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"part start candidates: {[bars[k] for k in part_cands]}")
+
+    def end(k: int) -> int:
+        return bars[k] + 1 if k < len(bars) else len(abc)
+
+    # Take first few bars
+    starts = [abc[: end(n - 1)] if n > 0 else ""]
 
-    starts = [start]
-    for i_part in i_part_cands:
-        starts.append(take_measures(abc[i_part:], n=n + 2))
+    for k in part_cands:
+        starts.append(abc[bars[k] : end(k + n + 1)])
         # FIXME: counting not accounting for the || and such
 
     return starts
@@ -192,6 +307,76 @@ class Result(TypedDict):
     """Name in the query."""
 
 
+def _fuzzy_key(name: str) -> str:
+    """Form of a (normalized) name used for fuzzy comparison:
+    lowercase, no apostrophes or other punctuation, no trailing ', The'.
+    """
+    from rapidfuzz import utils
+
+    # Drop apostrophes rather than letting default_process turn them into spaces,
+    # which would split off e.g. the "s" of "Paddy's" as a separate token
+    return utils.default_process(name.removesuffix(", The").replace("'", ""))
+
+
+@lru_cache(1)
+def _fuzzy_choices() -> tuple[list[str], list[str]]:
+    """Known names/aliases, and their :func:`_fuzzy_key` forms."""
+    names = list(load_aliases())
+    return names, [_fuzzy_key(name) for name in names]
+
+
+def fuzzy_match_name(name: str) -> tuple[str, tuple[int, ...]]:
+    """Find the known name/alias closest to `name`,
+    returning it and the IDs of the tunes it may refer to.
+
+    Uses the rapidfuzz ``token_sort_ratio`` scorer,
+    ignoring case, punctuation and a trailing ', The'.
+    Partial (substring) matches are not accepted.
+    Raises ``ValueError`` if no name/alias scores at least :data:`FUZZY_SCORE_CUTOFF`
+    or if the names/aliases that do score that high refer to different tunes.
+    """
+    from rapidfuzz import fuzz, process
+
+    names, keys = _fuzzy_choices()
+    key = _fuzzy_key(name)
+    cands = process.extract(
+        key,
+        keys,
+        scorer=fuzz.token_sort_ratio,
+        processor=None,
+        limit=None,
+        score_cutoff=FUZZY_SCORE_CUTOFF,
+    )
+    if not cands:
+        closest = process.extract(
+            key,
+            keys,
+            scorer=fuzz.token_sort_ratio,
+            processor=None,
+            limit=3,
+            score_cutoff=50,
+        )
+        msg = f"No tune found with name/alias {name!r}"
+        if closest:
+            msg += f". Closest: {', '.join(repr(names[i]) for _, _, i in closest)}"
+        raise ValueError(msg)
+
+    aliases = load_aliases()
+    _, best_score, i_best = cands[0]
+    best = names[i_best]
+    best_ids = aliases[best]
+    others = [names[i] for _, _, i in cands[1:] if aliases[names[i]] != best_ids]
+    if others:
+        raise ValueError(
+            f"Name {name!r} is close to multiple names/aliases "
+            f"that refer to different tunes: "
+            f"{', '.join(repr(other) for other in [best, *others[:4]])}"
+        )
+    logger.info(f"fuzzy matched name {name!r} to {best!r} (score {best_score:.0f})")
+
+    return best, best_ids
+
+
 def match(query: Query) -> Result:
     name_in = query["name"]
     name = normalize_name(query["name"])
@@ -201,28 +386,36 @@ def match(query: Query) -> Result:
         tune_type = normalize_type(tune_type)
     tune_id = query.get("tune_id")
 
-    # First try to match name
-    possible_ids = sorted(load_aliases().query("alias == @name")["tune_id"].unique())
+    # First try to match name, falling back to fuzzy matching
+    possible_ids = load_aliases().get(name, ())
     if not possible_ids:
-        raise ValueError(f"No tune found with name/alias {name!r}")
+        name, possible_ids = fuzzy_match_name(name)
+    if tune_id is not None:
+        possible_ids = tuple(tid for tid in possible_ids if tid == tune_id)
 
     # Now narrow based on type and key
-    s_query = "tune_id == @possible_ids"
-    if tune_type is not None:
-        s_query += " and type == @tune_type"
-    if key is not None:
-        s_query += " and key == @key"
-    if tune_id is not None:
-        s_query += " and tune_id == @tune_id"
-    matches = load_tunes().query(s_query)
+    # Type is the same for all settings of a tune, so it can be checked once per tune
+    tunes_by_id = _tunes_by_id()
+    matches = []
+    for tid in possible_ids:
+        settings = tunes_by_id.get(tid, [])
+        if not settings or (tune_type is not None and settings[0]["type"] != tune_type):
+            continue
+        matches += [row for row in settings if key is None or row["key"] == key]
 
-    if matches.empty:
+    if not matches:
         raise ValueError(
             f"No {name_in!r} tune found for type {tune_type!r} and key {key!r}"
         )
-    elif matches["tune_id"].nunique() > 1:
-        matches_ = matches.drop(columns="setting_id").drop_duplicates(
-            ["tune_id", "type", "key"], keep="first"
+    elif len(possible_ids) > 1 and any(
+        row["tune_id"] != matches[0]["tune_id"] for row in matches[1:]
+    ):
+        import pandas as pd
+
+        matches_ = (
+            pd.DataFrame(matches)
+            .drop(columns="setting_id")
+            .drop_duplicates(["tune_id", "type", "key"], keep="first")
         )
         raise ValueError(
             f"Multiple {name_in!r} tunes found for "
@@ -230,22 +423,18 @@ def match(query: Query) -> Result:
         )
 
     # Pick the oldest matching setting
-    setting_id = matches["setting_id"].min()
-    tune_id_out = matches["tune_id"].iloc[0]
+    oldest = min(matches, key=lambda row: row["setting_id"])
+    setting_id = oldest["setting_id"]
+    tune_id_out = oldest["tune_id"]
     if tune_id is not None:
         assert tune_id == tune_id_out
-    tune_type_out = matches["type"].iloc[0]
+    tune_type_out = oldest["type"]
     if tune_type is not None:
         assert tune_type == tune_type_out
-    key_out = matches["key"].iloc[0][:4]  # TODO: get abbr in a more general way
+    key_out = oldest["key"][:4]  # TODO: get abbr in a more general way
     if key is not None:
         assert key.startswith(key_out)
-    abc = (
-        matches.sort_values(by="setting_id", ascending=True)
-        .abc.iloc[0]
-        .replace("\r\n", "")
-    )
-    starts_ = starts(abc)
+    starts_ = starts(_abc_by_setting_id()[setting_id])
 
     return {
         "name": name,
@@ -278,10 +467,11 @@ def parse_set_type(type_input: str, num_tunes: int, /) -> list[str]:
         a, b = type_inputs
         a_is_plural = a.endswith("s")
         b_is_plural = b.endswith("s")
+        a, b = normalize_type(a), normalize_type(b)
         if num_tunes < 2:
             raise ValueError("Too many types")
         elif num_tunes == 2:
-            types = [normalize_type(a), normalize_type(b)]
+            types = [a, b]
         else:
             if a_is_plural and b_is_plural:
                 raise ValueError(
@@ -290,9 +480,9 @@ def parse_set_type(type_input: str, num_tunes: int, /) -> list[str]:
                     "(e.g. 'slip jig, jig, reel')."
                 )
             elif a_is_plural:
-                types = [normalize_type(a)] * (num_tunes - 1) + [normalize_type(b)]
+                types = [a] * (num_tunes - 1) + [b]
             elif b_is_plural:
-                types = [normalize_type(a)] + [normalize_type(b)] * (num_tunes - 1)
+                types = [a] + [b] * (num_tunes - 1)
             else:
                 raise ValueError("Not enough types")
     else:
@@ -343,14 +533,23 @@ def parse_tune(tune_input: str, /) -> Query:
     - Cooley's (Edor) [1]
     - Cooley's [1]
     """
-    # Optional key in parens or ID in brackets
-    # TODO: support setting ID with a [tune:setting] syntax
-    m = re.fullmatch(r"(.+?)\s*(?:\((.+?)\))?\s*(?:\[(.+?)\])?", tune_input)
-    if m is None:
+    if not tune_input:
         raise ValueError(f"Could not parse tune input {tune_input!r}")
-    name_, key_, id_ = m.groups()
-    if id_ is not None:
-        id_ = int(id_)
+
+    # Optional ID in brackets, at the end
+    # TODO: support setting ID with a [tune:setting] syntax
+    name_ = tune_input
+    id_: int | None = None
+    if name_.endswith("]") and 0 < (i := name_.rfind("[")) < len(name_) - 2:
+        id_ = int(name_[i + 1 : -1])
+        name_ = name_[:i]
+
+    # Optional key in parens, before the ID if there is one
+    name_ = name_.rstrip()
+    key_: str | None = None
+    if name_.endswith(")") and 0 < (i := name_.rfind("(")) < len(name_) - 2:
+        key_ = name_[i + 1 : -1]
+        name_ = name_[:i].rstrip()
 
     return {
         "name": name_,
@@ -378,11 +577,21 @@ def parse_set(set_line: str, /) -> list[Query]:
     return queries
 
 
-def get_member_set(member_id: int, set_id: int) -> list[Result]:
+@lru_cache(1)
+def _session() -> requests.Session:
+    """Shared HTTP session for The Session API, so connections are reused."""
     import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
 
+    return session
+
+
+def get_member_set(member_id: int, set_id: int) -> list[Result]:
     url = f"https://thesession.org/members/{member_id}/sets/{set_id}?format=json"
-    r = requests.get(url)
+    r = _session().get(url)
     r.raise_for_status()
     data = r.json()
 
@@ -405,16 +614,13 @@ def get_member_set(member_id: int, set_id: int) -> list[Result]:
 
 
 def get_member_sets(member_id: int) -> list[list[Result]]:
-    import requests
-
     url = f"https://thesession.org/members/{member_id}/sets?format=json"
-    r = requests.get(url)
+    r = _session().get(url)
     r.raise_for_status()
     data = r.json()
 
-    sets = []
-    for set in data["sets"]:
-        set_id = set["id"]
-        sets.append(get_member_set(member_id, set_id))
+    set_ids = [set["id"] for set in data["sets"]]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        sets = list(executor.map(partial(get_member_set, member_id), set_ids))
 
     return sets
@@ -7,6 +7,9 @@ from typing import Iterable, TYPE_CHECKING
 if TYPE_CHECKING:
     from . import Result
 
+_MULTISPACE_RE = re.compile(r"\s{2,}")
+_PART_LABELS = ascii_uppercase[1:]
+
 
 HEAD_SNIPPET = """\
 <!DOCTYPE html>
@@ -41,9 +44,10 @@ def tune_to_html(tune: Result, *, div_id: str | None = None) -> str:
     if div_id is None:
         div_id = f"music-{tune['tune_id']}"
 
-    abc = f"K: {tune['key']}\nP: A\n{tune['starts'][0]}"
-    for part_label, other_part in zip(ascii_uppercase[1:], tune["starts"][1:]):
-        abc += f"\nP: {part_label}\n{other_part}"
+    abc_lines = [f"K: {tune['key']}", "P: A", tune["starts"][0]]
+    for part_label, other_part in zip(_PART_LABELS, tune["starts"][1:]):
+        abc_lines += [f"P: {part_label}", other_part]
+    abc = "\n".join(abc_lines)
 
     tune_id = tune["tune_id"]
     setting_id = tune["setting_id"]
@@ -61,18 +65,16 @@ def set_to_html(set: Iterable[Result], *, heading: str | None = None) -> str:
         heading = f"{types_str}: {tunes_str}"
 
     # Ensure only single spaces separate words
-    heading = re.sub(r"\s{2,}", " ", heading)
+    heading = _MULTISPACE_RE.sub(" ", heading)
 
     # Replace fancy quote for 's
     heading = heading.replace("’", "&rsquo;")
 
-    s = f"<h2>{heading}</h2>\n"
-    s += "<ol>\n"
-
-    s += "\n".join(f"  <li>{tune_to_html(tune)}</li>" for tune in set)
-    s += "\n</ol>"
+    parts = [f"<h2>{heading}</h2>\n<ol>\n"]
+    parts.append("\n".join([f"  <li>{tune_to_html(tune)}</li>" for tune in set]))
+    parts.append("\n</ol>")
 
-    return s
+    return "".join(parts)
 
 
 def setlist_to_html(
@@ -81,16 +83,16 @@ def setlist_to_html(
     render: bool = True,
     fullpage: bool = True,
 ) -> str:
-    s = ""
+    parts = []
     if fullpage:
-        s += HEAD_SNIPPET + "<body>\n"
+        parts += [HEAD_SNIPPET, "<body>\n"]
 
-    s += "\n".join(set_to_html(set) for set in sets)
+    parts.append("\n".join([set_to_html(set) for set in sets]))
 
     if render:
-        s += "\n" + RENDER_SNIPPET
+        parts += ["\n", RENDER_SNIPPET]
 
     if fullpage:
-        s += "</body>\n</html>"
+        parts.append("</body>\n</html>")
 
-    return s
+    return "".join(parts)
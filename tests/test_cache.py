@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from pyabc2.sources import the_session
+
+import trad_setlist_helper as tsh
+
+COLUMNS = ["tune_id", "name"]
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> list[str]:
+    calls: list[str] = []
+
+    def load_meta(which: str) -> pd.DataFrame:
+        calls.append(which)
+        return pd.DataFrame({"tune_id": [1], "name": ["Cooley's"], "other": [0]})
+
+    monkeypatch.setattr(the_session, "load_meta", load_meta)
+    monkeypatch.setattr(tsh, "CACHE_DIR", tmp_path / "cache")
+
+    return calls
+
+
+def test_cache_reused(calls: list[str]) -> None:
+    tsh._load_meta("tunes", COLUMNS)
+    df = tsh._load_meta("tunes", COLUMNS)
+    assert calls == ["tunes"]
+    assert df.columns.tolist() == COLUMNS
+    assert [p.name for p in tsh.CACHE_DIR.iterdir()] == ["tunes.pkl"]
+
+
+def test_cache_unreadable(calls: list[str]) -> None:
+    tsh._load_meta("tunes", COLUMNS)
+    fp = tsh.CACHE_DIR / "tunes.pkl"
+    fp.write_bytes(fp.read_bytes()[:10])
+
+    df = tsh._load_meta("tunes", COLUMNS)
+    assert calls == ["tunes", "tunes"]
+    assert df["name"].tolist() == ["Cooley's"]
+
+    # And the cache was rewritten
+    assert pd.read_pickle(fp).equals(df)
+
+
+def test_cache_unwritable(
+    calls: list[str], monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    not_a_dir = tmp_path / "file"
+    not_a_dir.touch()
+    monkeypatch.setattr(tsh, "CACHE_DIR", not_a_dir / "cache")
+
+    df = tsh._load_meta("tunes", COLUMNS)
+    assert calls == ["tunes"]
+    assert df["name"].tolist() == ["Cooley's"]
+
+
+@pytest.mark.parametrize("value", ["", "relative/cache"])
+def test_cache_home_ignored(monkeypatch: pytest.MonkeyPatch, value: str) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", value)
+    assert tsh._cache_home() == Path.home() / ".cache"
+
+
+def test_cache_home(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert tsh._cache_home() == tmp_path
@@ -20,5 +20,19 @@ def test_cooleys() -> None:
     assert result["name_input"] == "Cooley's"
 
 
+def test_cooleys_fuzzy() -> None:
+    query: Query = {
+        "name": "Coolley's",
+        "type": "reel",
+        "key": "Edor",
+    }
+    result = match(query)
+
+    assert result["tune_id"] == 1
+    assert result["name"] == "Cooley's"
+    assert result["name_input"] == "Coolley's"
+
+
 if __name__ == "__main__":
     test_cooleys()
+    test_cooleys_fuzzy()
@@ -0,0 +1,77 @@
+from collections.abc import Iterator
+
+import pytest
+
+import trad_setlist_helper as tsh
+from trad_setlist_helper import fuzzy_match_name, match
+
+ALIASES = {
+    "Cooley's": (1,),
+    "Star Of Munster, The": (2,),
+    "Kesh, The": (3,),
+    "Kesh Jig": (3,),
+    "Kesh Jig, The": (3,),
+    "Maid Behind The Bar, The": (4,),
+    "Maids Behind The Bar, The": (5,),
+    "Paddy's Return": (6,),
+    "Tobin's Favourite": (7,),
+}
+
+TUNES_BY_ID = {
+    1: [{"tune_id": 1, "setting_id": 1, "type": "reel", "key": "Edorian"}],
+    2: [{"tune_id": 2, "setting_id": 2, "type": "reel", "key": "Aminor"}],
+    3: [{"tune_id": 3, "setting_id": 3, "type": "jig", "key": "Gmajor"}],
+    4: [{"tune_id": 4, "setting_id": 4, "type": "reel", "key": "Dmajor"}],
+    5: [{"tune_id": 5, "setting_id": 5, "type": "reel", "key": "Dmajor"}],
+}
+
+
+@pytest.fixture(autouse=True)
+def stub_data(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(tsh, "load_aliases", lambda: ALIASES)
+    monkeypatch.setattr(tsh, "_tunes_by_id", lambda: TUNES_BY_ID)
+    monkeypatch.setattr(tsh, "_abc_by_setting_id", lambda: dict.fromkeys(range(6), ""))
+    tsh._fuzzy_choices.cache_clear()
+    yield
+    tsh._fuzzy_choices.cache_clear()
+
+
+def test_fuzzy_match() -> None:
+    assert fuzzy_match_name("Coolley's") == ("Cooley's", (1,))
+
+    result = match({"name": "Coolley's"})
+    assert result["tune_id"] == 1
+    assert result["name"] == "Cooley's"
+    assert result["name_input"] == "Coolley's"
+
+
+def test_fuzzy_match_missing_the() -> None:
+    assert fuzzy_match_name("Star Of Munster") == ("Star Of Munster, The", (2,))
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("Paddys Return", "Paddy's Return"),
+        ("paddy's return", "Paddy's Return"),
+        ("Tobins Favorite", "Tobin's Favourite"),
+    ],
+)
+def test_fuzzy_match_apostrophe(name: str, expected: str) -> None:
+    assert fuzzy_match_name(name)[0] == expected
+
+
+def test_fuzzy_match_same_tune() -> None:
+    # Several close aliases, but all for the same tune
+    assert fuzzy_match_name("Kesh Jigg")[1] == (3,)
+
+
+@pytest.mark.parametrize("name", ["Star", "Munster", "Zzzz"])
+def test_fuzzy_no_match(name: str) -> None:
+    with pytest.raises(ValueError, match="No tune found"):
+        match({"name": name})
+
+
+def test_fuzzy_ambiguous() -> None:
+    with pytest.raises(ValueError, match="refer to different tunes"):
+        match({"name": "Maid Behind The Bars"})
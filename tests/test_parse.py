@@ -0,0 +1,27 @@
+import pytest
+
+from trad_setlist_helper import parse_tune
+
+
+@pytest.mark.parametrize(
+    "tune_input, expected",
+    [
+        ("Cooley's", ("Cooley's", None, None)),
+        ("Cooley's (Edor)", ("Cooley's", "Edor", None)),
+        ("Cooley's (Edor) [1]", ("Cooley's", "Edor", 1)),
+        ("Cooley's(Edor)[1]", ("Cooley's", "Edor", 1)),
+        ("Cooley's [1]", ("Cooley's", None, 1)),
+        ("Cooley's  ", ("Cooley's", None, None)),
+        ("MacFadden's (No. 1) (Dmix)", ("MacFadden's (No. 1)", "Dmix", None)),
+    ],
+)
+def test_parse_tune(tune_input: str, expected: tuple) -> None:
+    query = parse_tune(tune_input)
+    assert (query["name"], query["key"], query["tune_id"]) == expected
+
+
+def test_parse_tune_bad() -> None:
+    with pytest.raises(ValueError):
+        parse_tune("")
+    with pytest.raises(ValueError):
+        parse_tune("Cooley's [one]")
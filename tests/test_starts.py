@@ -0,0 +1,29 @@
+from trad_setlist_helper import starts, take_measures
+
+COOLEYS = (
+    "|:D2|EBBA B2 EB|B2 AB dBAG|FDAD BDAD|FDAD dAFD|"
+    "EBBA B2 EB|B2 AB defg|afec dBAF|DEFD E2:|"
+    "|:gf|eB B2 efge|eB B2 gedB|A2 FA DAFA|A2 FA defg|"
+    "eB B2 eBgB|eB B2 defg|afec dBAF|DEFD E2:|"
+)
+
+
+def test_starts() -> None:
+    assert starts(COOLEYS) == [
+        "|:D2|EBBA B2 EB|B2 AB dBAG|FDAD BDAD|",
+        "||:gf|eB B2 efge|eB B2 gedB|A2 FA DAFA|A2 FA defg|",
+    ]
+
+
+def test_starts_short() -> None:
+    assert starts("") == [""]
+    assert starts("A|B|C") == ["A|B|C"]
+    assert starts("A|B|C|D|E|F|G|", n=2) == ["A|B|"]
+
+
+def test_take_measures() -> None:
+    assert take_measures("A|B|C|", n=0) == ""
+    assert take_measures("A|B|C", n=5) == "A|B|C"
+    assert take_measures("A|B|C|", n=3) == "A|B|C|"
+    assert take_measures("A|B|C|D", n=2) == "A|B|"
+    assert take_measures("|:D2|EB|B2:|") == "|:D2|EB|B2:|"